@@ -18,27 +18,175 @@ In the configuration file you can specify which data should be reported. In this
         - ...
         - ...
 """
-import sys
+import csv
 from collections.abc import Iterable
 import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-try:
-    import cupy as cp
-except (ModuleNotFoundError, ImportError):
-    pass
-import pandas as pd
-from numba import njit
 from math import isinf
 from copy import deepcopy
-from typing import DefaultDict, Union, Any
+from typing import DefaultDict, Union, Any, Callable
+
+_cupy = None
+
+def _get_cupy():
+    """Imports CuPy on first use, such that importing the reporter does not import CuPy for models that do not use it.
+
+    Returns:
+        cupy: The CuPy module, or None if CuPy is not installed.
+    """
+    global _cupy
+    if _cupy is None:
+        try:
+            import cupy
+        except (ModuleNotFoundError, ImportError):
+            return None
+        _cupy = cupy
+    return _cupy
+
+def _to_host(value: Any) -> Any:
+    """Copies CuPy arrays to host memory in a single transfer. Any other value is returned as is.
+
+    Args:
+        value: The value to be copied.
+
+    Returns:
+        value: The value, as NumPy array if it was a CuPy array.
+    """
+    if type(value).__module__.startswith('cupy'):
+        return _get_cupy().asnumpy(value)
+    return value
+
+def _copy_values(values: Any) -> Any:
+    """Copies values, so that they are no longer linked to the agent data. Arrays are copied with their own `copy` method, which is much faster than `deepcopy`.
+
+    Args:
+        values: The values to be copied.
+
+    Returns:
+        values: Copy of the values.
+    """
+    if isinstance(values, np.ndarray):
+        return values.copy()
+    elif hasattr(values, 'copy') and not isinstance(values, (list, dict, tuple)):  # e.g., CuPy arrays
+        return values.copy()
+    elif isinstance(values, list):
+        return [v.copy() if isinstance(v, np.ndarray) or type(v).__module__.startswith('cupy') else v for v in values]
+    else:
+        return deepcopy(values)
+
+class ReportEntry:
+    """This class holds the compiled report configuration of a single reported variable, which is created once by :meth:`honeybees.reporter.Reporter.compile_plan`.
+
+    Args:
+        name: Name of the data to report.
+        conf: Dictionary with report configuration for values.
+        agents: The relevant agent class.
+        varname: Attribute name of variable in agent class.
+        function: Function as specified in the configuration.
+        fn_scalar: Callable that reduces the data to a single value, or None if data is reported literally.
+        fn_grouped: Callable that reduces the data to a value per group, or None if data is reported literally.
+        has_ids: Whether the data is reduced per group.
+        scale: Attribute name of the group IDs in the agent class, or None if data is not grouped.
+        n_groups: The total number of groups, or None if data is not grouped.
+        split: Whether the data is split per ID.
+        split_vectorized: Whether the split data is parsed for all IDs at once.
+        save: Whether the data is saved in memory.
+        export: Whether the data is exported to disk.
+        initial_only: Whether the data is only exported in the first timestep.
+        folder: Folder the data is exported to, or None if the data is not exported.
+    """
+    __slots__ = ('name', 'conf', 'agents', 'varname', 'function', 'fn_scalar', 'fn_grouped', 'has_ids', 'scale', 'n_groups', 'split', 'split_vectorized', 'save', 'export', 'initial_only', 'folder')
+
+    def __init__(self, name: str, conf: dict, agents, varname: str, function: Any, fn_scalar: Union[None, Callable], fn_grouped: Union[None, Callable], has_ids: bool, scale: Union[None, str], n_groups: Union[None, int], split: bool, split_vectorized: bool, save: bool, export: bool, initial_only: bool, folder: Union[None, str]) -> None:
+        self.name = name
+        self.conf = conf
+        self.agents = agents
+        self.varname = varname
+        self.function = function
+        self.fn_scalar = fn_scalar
+        self.fn_grouped = fn_grouped
+        self.has_ids = has_ids
+        self.scale = scale
+        self.n_groups = n_groups
+        self.split = split
+        self.split_vectorized = split_vectorized
+        self.save = save
+        self.export = export
+        self.initial_only = initial_only
+        self.folder = folder
+
+class TimeseriesBuffer:
+    """This class stores one value per timestep in a preallocated NumPy array, and grows the array when more timesteps are stored than were allocated. It behaves like the list that is otherwise used to store values: only the stored timesteps are exposed, and indexing returns native Python values, such that values remain JSON-serializable for visualisation. The array is allocated when the first value is stored, using the type of that value, such that for example integers remain integers.
+
+    Args:
+        n_timesteps: Number of timesteps to allocate.
+        shape: Shape of the value stored for each timestep. An empty tuple for scalar values.
+    """
+    __slots__ = ('data', 'size', 'n_timesteps', 'shape')
+
+    def __init__(self, n_timesteps: int, shape: tuple=()) -> None:
+        self.n_timesteps = max(n_timesteps, 1)
+        self.shape = shape
+        self.data = None
+        self.size = 0
+
+    @property
+    def array(self) -> np.ndarray:
+        """Returns a view of the stored timesteps.
+
+        Returns:
+            array: Array of the stored values.
+        """
+        if self.data is None:
+            return np.empty((0, ) + self.shape)
+        return self.data[:self.size]
+
+    def append(self, value: Any) -> None:
+        """Stores the value for the next timestep.
+
+        Args:
+            value: The value to be stored.
+        """
+        dtype = np.asarray(value).dtype
+        if self.data is None:
+            self.data = np.empty((self.n_timesteps, ) + self.shape, dtype=dtype)
+        elif not np.can_cast(dtype, self.data.dtype):  # e.g., a float is stored after integers
+            self.data = self.data.astype(np.promote_types(self.data.dtype, dtype))
+        if self.size == self.data.shape[0]:  # more timesteps were stored than allocated, so grow the array
+            grown = np.empty((2 * self.size, ) + self.data.shape[1:], dtype=self.data.dtype)
+            grown[:self.size] = self.data
+            self.data = grown
+        self.data[self.size] = value
+        self.size += 1
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        return self.array[index].tolist()
+
+    def __iter__(self):
+        return iter(self.array.tolist())
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        return np.asarray(self.array, dtype=dtype)
 
 class Reporter:
     """This class is used to report data to disk or for visualisation. The `step` method is called each timestep from the model.
+
+    Files in NumPy binary format are written on a background thread. An error while writing such a file is raised at the next export in NumPy binary format, or when :meth:`honeybees.reporter.Reporter.flush` or :meth:`honeybees.reporter.Reporter.report` is called. Call either of these at the end of a run to make sure all files are written and no errors occurred.
     
     Args:
         model: The model.
         subfolder: Optional name of the subfolder to be reported in. By default the report folder from the configuration file is used (general:report_folder).
     """
+    ISO_STRIP = str.maketrans('', '', '-:')  # removes dashes and colons from isoformat timestamps for use in filenames
+    NUMPY_TYPES = (np.ndarray, np.generic)
+    MAX_PENDING_WRITES = 64  # maximum number of npy-files queued for writing, bounding the memory held by the queue
+    MEMMAP_THRESHOLD = 1 << 20  # arrays of at least this number of bytes are written through a memory map
+
     def __init__(self, model, subfolder: Union[None, str]=None) -> None:
         self.model = model
         if not hasattr(self.model, 'agents'):  # ensure agents exist
@@ -46,14 +194,62 @@ class Reporter:
         
         self.variables = {}
         self.timesteps = []
+        self.ID_order = {}  # order of the IDs of split variables, used for the columns of the report
+
+        # npy-files are written on a background thread, such that the model can continue while the data is written to disk. A single worker ensures files are written in order, also when the same file is written twice.
+        self.io_pool = ThreadPoolExecutor(max_workers=1)
+        self.pending_writes = deque()
 
         self.export_folder = self.model.config['general']['report_folder']
         if subfolder:
             self.export_folder = os.path.join(self.export_folder, subfolder)
         self.maybe_create_export_folder()
+
+        self.plan = self.compile_plan()
+        for entry in self.plan:
+            self.preallocate_variable(entry)
         
         self.step()
 
+    def __del__(self) -> None:
+        if hasattr(self, 'io_pool'):
+            self.io_pool.shutdown(wait=True)  # finish queued writes. Errors are not raised here, use flush or report to check for these.
+
+    def flush(self) -> None:
+        """Waits until all queued npy-files are written to disk. Errors that occured while writing are raised here. This is called by :meth:`honeybees.reporter.Reporter.report`."""
+        while self.pending_writes:
+            self.pending_writes.popleft().result()
+
+    def save_npy(self, fp: str, value: Any) -> None:
+        """Queues a value to be saved in NumPy binary format on the background thread. Arrays are copied before they are queued, because they may be (a view of) agent data that changes while the file is queued. Errors of writes that have finished in the meantime are raised here. If too many files are queued, waits for the oldest to be written.
+
+        Args:
+            fp: Filepath of the file.
+            value: The value to be saved.
+        """
+        if isinstance(value, np.ndarray):
+            value = value.copy()
+        # files are written in order by a single worker, so finished writes are at the start of the queue
+        while self.pending_writes and (self.pending_writes[0].done() or len(self.pending_writes) >= self.MAX_PENDING_WRITES):
+            self.pending_writes.popleft().result()
+        self.pending_writes.append(self.io_pool.submit(self.write_npy, fp, value))
+
+    @classmethod
+    def write_npy(cls, fp: str, value: Any) -> None:
+        """Saves a value in NumPy binary format. Large arrays are copied into a memory-mapped npy-file, which is written to disk through the page cache without an intermediate buffer, and can be memory-mapped by readers as well. Small arrays and other values are saved with `np.save`.
+
+        Args:
+            fp: Filepath of the file.
+            value: The value to be saved.
+        """
+        if isinstance(value, np.ndarray) and value.nbytes >= cls.MEMMAP_THRESHOLD and not value.dtype.hasobject:
+            memmap = np.lib.format.open_memmap(fp, mode='w+', dtype=value.dtype, shape=value.shape)
+            np.copyto(memmap, value)
+            memmap.flush()
+            del memmap
+        else:
+            np.save(fp, value)
+
     def maybe_create_export_folder(self) -> None:
         """If required, create folder export folder"""
         try:
@@ -62,7 +258,7 @@ class Reporter:
             pass
 
     def check_value(self, value: Any):
-        """Check whether the value is a Python integer or float, and is not infinite.
+        """Check whether the value is a Python integer or float, and is not infinite. The type check always runs, while the check for infinite values is an assertion that is skipped when Python is run with -O.
         
         Args:
             value: The value to be checked.
@@ -72,91 +268,89 @@ class Reporter:
         if isinstance(value, float):
             assert not isinf(value)
 
-    def export_value(self, name: str, value: np.ndarray, conf: dict) -> None:
+    def export_value(self, name: Union[str, tuple[str, Any]], value: np.ndarray, entry: ReportEntry) -> None:
         """Exports an array of values to the export folder.
         
         Args:
             name: Name of the value to be exported.
             value: The array itself.
-            conf: Configuration for saving the file. Contains options such a file format, and whether to export the array in this timestep at all.
+            entry: Compiled report configuration for values. Contains options such a file format and the folder to export to.
         """
-        folder = os.path.join(self.export_folder, name)
-        try:
-            os.makedirs(folder)
-        except OSError:
-            pass
-        if 'format' not in conf:
-            raise ValueError(f"Export format must be specified for {name} in config file (npy/csv/xlsx).")
+        conf = entry.conf
+        # paths are built with f-strings rather than os.path.join, as this is called for every exported value. The folders are created in compile_plan.
+        if isinstance(name, tuple):
+            folder = f"{entry.folder}{os.sep}{name[1]}"
+        else:
+            folder = entry.folder
         if 'frequency' in conf and conf['frequency'] == 'initial_only':
             fn = 'initial'
         else:
-            fn = f"{self.timesteps[-1].isoformat().replace('-', '').replace(':', '')}"
+            fn = self.timestep_tag
         if conf['format'] == 'npy':
-            fn += '.npy'
-            fp = os.path.join(folder, fn)
-            np.save(fp, value)
+            fp = f"{folder}{os.sep}{fn}.npy"
+            self.save_npy(fp, value)
         elif conf['format'] == 'csv':
-            fn += '.csv'
-            fp = os.path.join(folder, fn)
-            if isinstance(value, (np.ndarray, cp.ndarray)):
-                value = value.tolist()
+            fp = f"{folder}{os.sep}{fn}.csv"
             if len(value) > 100_000:
                 self.model.logger.info(f"Exporting {len(value)} items to csv. This might take a long time and take a lot of space. Consider using NumPy binary format (npy).")
-            with open(fp, 'w') as f:
-                f.write("\n".join([str(v) for v in value]))
+            if isinstance(value, np.ndarray) and value.dtype.kind not in 'SU':
+                # joining the values of tolist() is faster than np.savetxt, which formats the array row by row. Each row of a 2D-array is written as a list.
+                with open(fp, 'w', buffering=1 << 20) as f:
+                    f.write("\n".join([str(v) for v in value.tolist()]))
+            else:
+                if isinstance(value, np.ndarray):  # strings
+                    value = value.tolist()
+                with open(fp, 'w', newline='', buffering=1 << 20) as f:
+                    csv.writer(f, lineterminator='\n').writerows([v] for v in value)
         else:
             raise ValueError(f"{conf['format']} not recognized")
 
-    def report_value(self, name: Union[str, tuple[str, Any]], value: Any, conf: dict) -> None:
+    def report_value(self, name: Union[str, tuple[str, Any]], value: Any, entry: ReportEntry) -> None:
         """This method is used to save and/or export model values.
 
         Args:
             name: Name of the value to be exported.
             value: The array itself.
-            conf: Configuration for saving the file. Contains options such a file format, and whether to export the data or save the data in the model.
+            entry: Compiled report configuration for values. Contains options such a file format, and whether to export the data or save the data in the model.
         """
+        value_type = type(value)
+        if value_type is not np.ndarray:  # NumPy arrays are by far the most common, and never need to be moved to the host
+            value = _to_host(value)
+            value_type = type(value)
         # check if value is of numpy type and check if size is 1. If so, convert to native python type.
-        if isinstance(value, (np.ndarray, np.generic, cp.ndarray, cp.generic) if 'cupy' in sys.modules else (np.ndarray, np.generic)):
+        if value_type is np.ndarray or isinstance(value, self.NUMPY_TYPES):
             if value.size == 1:
                 value = value.item()
                 self.check_value(value)
         if isinstance(value, list):
-            value = [v.item() for v in value]
+            if value and type(value[0]).__module__.startswith('cupy'):
+                value = _get_cupy().stack(value).get().tolist()  # single device to host copy rather than one per item
+            elif value and isinstance(value[0], np.generic):
+                value = [v.item() for v in value]
             for v in value:
                 self.check_value(v)
-        
-        if 'save' not in conf:
-            raise ValueError(f"Save type must be specified for {name} in config file (save/save+export/export).")
-        if conf['save'] not in ('save', 'export', 'save+export'):
-            raise ValueError(f"Save type for {name} in config file must be 'save', 'save+export' or 'export').")
-        
-        if conf['save'] == 'export' or conf['save'] == 'save+export':
-            if 'initial_only' in conf and conf['initial_only']:
-                if self.model.current_timestep == 0:
-                    self.export_value(name, value, conf)
-            else:
-                self.export_value(name, value, conf)
 
-        if conf['save'] == 'save' or conf['save'] == 'save+export':
+        if entry.export and (not entry.initial_only or self.model.current_timestep == 0):
+            self.export_value(name, value, entry)
+
+        if entry.save:
             try:
                 if isinstance(name, tuple):
                     name, ID = name
                     if name not in self.variables:
                         self.variables[name] = {}
-                    if ID not in self.variables[name]:
-                        self.variables[name][ID] = []
-                    self.variables[name][ID].append(value)
+                    variables, key = self.variables[name], ID
                 else:
-                    if name not in self.variables:
-                        self.variables[name] = []
-                    self.variables[name].append(value)
+                    variables, key = self.variables, name
+                if key not in variables:
+                    variables[key] = []
+                variables[key].append(value)
             except KeyError:
                 raise KeyError(f"Variable {name} not initialized. This likely means that an agent is reporting for a group that was not is not the reporter")
 
     @staticmethod
-    @njit
     def mean_per_ID(values: np.ndarray, group_ids: np.ndarray, n_groups: int) -> np.ndarray:
-        """Calculates the mean value per group.
+        """Calculates the mean value per group. Groups without any values are NaN.
 
         Args:
             values: Numpy array of values.
@@ -167,20 +361,17 @@ class Reporter:
             mean_per_ID: The mean value for each of the groups.
         """
         assert values.size == group_ids.size
-        size = values.size
-        count_per_group = np.zeros(n_groups, dtype=np.int32)
-        sum_per_group = np.zeros(n_groups, dtype=values.dtype)
-        for i in range(size):
-            group_id = group_ids[i]
-            assert group_id < n_groups
-            count_per_group[group_id] += 1
-            sum_per_group[group_id] += values[i]
-        return sum_per_group / count_per_group
+        sum_per_group = np.bincount(group_ids, weights=values, minlength=n_groups)
+        count_per_group = np.bincount(group_ids, minlength=n_groups)
+        assert sum_per_group.size == n_groups
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_per_group = sum_per_group / count_per_group
+        mean_per_group[count_per_group == 0] = np.nan
+        return mean_per_group
 
     @staticmethod
-    @njit
     def sum_per_ID(values: np.ndarray, group_ids: np.ndarray, n_groups: int) -> np.ndarray:
-        """Calculates the sum value per group.
+        """Calculates the sum value per group. The sum is always returned as float64, which is what `np.bincount` computes, regardless of the type of the values.
 
         Args:
             values: Numpy array of values.
@@ -191,83 +382,215 @@ class Reporter:
             sum_per_ID: The sum value for each of the groups.
         """
         assert values.size == group_ids.size
-        size = values.size
-        sum_per_group = np.zeros(n_groups, dtype=values.dtype)
-        for i in range(size):
-            group_id = group_ids[i]
-            assert group_id < n_groups
-            sum_per_group[group_id] += values[i]
+        sum_per_group = np.bincount(group_ids, weights=values, minlength=n_groups)
+        assert sum_per_group.size == n_groups
         return sum_per_group
 
-    def parse_agent_data(self, name: str, values: Any, agents, conf: dict) -> None:
+    def parse_agent_data(self, name: Union[str, tuple[str, Any]], values: Any, entry: ReportEntry) -> None:
         """This method is used to apply the relevant function to the given data.
         
         Args:
             name: Name of the data to report.
             values: Numpy array of values.
-            agents: The relevant agent class.
-            conf: Dictionary with report configuration for values.
+            entry: Compiled report configuration for values.
         """
-        function = conf['function']
+        if entry.function is None:
+            values = _copy_values(values)  # need to copy item, because values are passed without applying any a function.
+            self.report_value(name, values, entry)
+        elif entry.has_ids:
+            self.report_value(name, entry.fn_grouped(values, getattr(entry.agents, entry.scale), entry.n_groups), entry)
+        else:
+            self.report_value(name, entry.fn_scalar(values), entry)
+
+    def parse_split_agent_data(self, name: str, values: Any, entry: ReportEntry) -> None:
+        """This method is used to apply the relevant function to data that is split per ID, such as data per administrative unit. Rather than parsing the data for each ID separately, the values of all IDs are concatenated and the sum per ID is computed in a single call to `np.add.reduceat`. The mean of IDs without any values is NaN, and the sum is 0.
+
+        Args:
+            name: Name of the data to report.
+            values: List of Numpy arrays, one for each ID.
+            entry: Compiled report configuration for values.
+        """
+        if len(values) == 0:
+            return
+        function = entry.function
+        IDs = entry.agents.ids
+        lengths = np.fromiter((len(admin_values) for admin_values in values), dtype=np.int64, count=len(values))
+        offsets = np.cumsum(lengths) - lengths
+        flat_values = np.concatenate(values)  # concatenate creates a copy, so values are no longer linked to the agent data.
         if function is None:
-            values = deepcopy(values)  # need to copy item, because values are passed without applying any a function.
-            self.report_value(name, values, conf)
+            for ID, admin_values in zip(IDs, np.split(flat_values, offsets[1:])):
+                self.report_value((name, ID), admin_values, entry)
         else:
-            if 'ids' in conf:
-                group_ids = getattr(agents, conf['scale'])
-                n_groups = conf['ids'].size
-                if callable(function):
-                    fn = function
-                elif function == 'mean':
-                    fn = self.mean_per_ID
-                elif function == 'sum':
-                    fn = self.sum_per_ID
-                else:
-                    raise ValueError(f'{function} function unknown')
-                self.report_value(name, fn(values, group_ids, n_groups), conf)
-            else:
-                if callable(function):
-                    fn = function
-                elif function == 'mean':
-                    fn = np.mean
-                elif function == 'sum':
-                    fn = np.sum
-                else:
-                    raise ValueError(f'{function} function unknown')
-                self.report_value(name, fn(getattr(agents, conf['varname'])), conf)
+            has_values = lengths > 0
+            result = np.full(lengths.size, np.nan if function == 'mean' else 0, dtype=np.float64)
+            if has_values.any():
+                # offsets of empty IDs are skipped, such that each offset is followed by the offset of the next ID with values.
+                result[has_values] = np.add.reduceat(flat_values, offsets[has_values])
+            if function == 'mean':
+                result[has_values] /= lengths[has_values]
+            for ID, value in zip(IDs, result):
+                self.report_value((name, ID), value, entry)
 
-    def extract_agent_data(self, name: str, conf: dict) -> None:
+    def extract_agent_data(self, entry: ReportEntry) -> None:
         """This method is used to extract agent data and apply the relevant function to the given data.
         
         Args:
-            name: Name of the data to report.
-            conf: Dictionary with report configuration for values.
+            entry: Compiled report configuration for values.
         """
-        agents = getattr(self.model.agents, conf['type'])
         try:
-            values = getattr(agents, conf['varname'])
+            values = getattr(entry.agents, entry.varname)
         except AttributeError:
-            raise AttributeError(f"Trying to export '{conf['varname']}', but no such attribute exists for agent type '{conf['type']}'")
-        if 'split' in conf and conf['split']:
-            for ID, admin_values in zip(agents.ids, values):
-                self.parse_agent_data((name, ID), admin_values, agents, conf)
+            raise AttributeError(f"Trying to export '{entry.varname}', but no such attribute exists for agent type '{entry.conf['type']}'")
+        if entry.split_vectorized:
+            self.parse_split_agent_data(entry.name, values, entry)
+        elif entry.split:
+            for ID, admin_values in zip(entry.agents.ids, values):
+                self.parse_agent_data((entry.name, ID), admin_values, entry)
         else:
-            self.parse_agent_data(name, values, agents, conf)
+            self.parse_agent_data(entry.name, values, entry)
+
+    def compile_plan(self) -> list[ReportEntry]:
+        """Resolves the report configuration once, so that the agent class, function, number of groups and export folder for each reported variable do not need to be looked up every timestep. Export folders are created here.
+
+        Returns:
+            plan: List of compiled report configurations, in the order of the configuration file.
+        """
+        plan = []
+        if self.model.config is None or 'report' not in self.model.config:
+            return plan
+        functions = {
+            None: (None, None),
+            'mean': (np.mean, self.mean_per_ID),
+            'sum': (np.sum, self.sum_per_ID),
+        }
+        for name, conf in self.model.config['report'].items():
+            function = conf['function']
+            has_ids = 'ids' in conf
+            if callable(function):
+                fn_scalar = fn_grouped = function
+            elif function in functions:
+                fn_scalar, fn_grouped = functions[function]
+            else:
+                raise ValueError(f'{function} function unknown')
+            if 'save' not in conf:
+                raise ValueError(f"Save type must be specified for {name} in config file (save/save+export/export).")
+            if conf['save'] not in ('save', 'export', 'save+export'):
+                raise ValueError(f"Save type for {name} in config file must be 'save', 'save+export' or 'export').")
+            agents = getattr(self.model.agents, conf['type'])
+            split = bool(conf.get('split', False))
+            export = conf['save'] in ('export', 'save+export')
+            folder = None
+            if export:
+                if 'format' not in conf:
+                    raise ValueError(f"Export format must be specified for {name} in config file (npy/csv/xlsx).")
+                folder = os.path.join(self.export_folder, name)
+                os.makedirs(folder, exist_ok=True)
+                if split:
+                    for ID in agents.ids:
+                        os.makedirs(os.path.join(folder, str(ID)), exist_ok=True)
+            if split:
+                self.ID_order[name] = list(agents.ids)
+            plan.append(
+                ReportEntry(
+                    name=name,
+                    conf=conf,
+                    agents=agents,
+                    varname=conf['varname'],
+                    function=function,
+                    fn_scalar=fn_scalar,
+                    fn_grouped=fn_grouped,
+                    has_ids=has_ids,
+                    scale=conf['scale'] if has_ids else None,
+                    n_groups=int(conf['ids'].size) if has_ids else None,
+                    split=split,
+                    split_vectorized=split and function in functions,
+                    save=conf['save'] in ('save', 'save+export'),
+                    export=export,
+                    initial_only=bool(conf.get('initial_only', False)),
+                    folder=folder,
+                )
+            )
+        return plan
+
+    def preallocate_variable(self, entry: ReportEntry) -> None:
+        """Preallocates the in-memory storage for a saved variable when the size of its output is known in advance, that is when the function is 'mean' or 'sum' and the number of timesteps of the model is known. The values for each timestep are then stored in a :class:`honeybees.reporter.TimeseriesBuffer` rather than a list. Other variables are stored in a list.
+
+        Args:
+            entry: Compiled report configuration for values.
+        """
+        if not entry.save or entry.function not in ('mean', 'sum') or self.model.n_timesteps is None:
+            return
+        n_timesteps = self.model.n_timesteps + 1  # the reporter also reports once when it is initialized
+        if entry.split:
+            self.variables[entry.name] = {ID: TimeseriesBuffer(n_timesteps) for ID in entry.agents.ids}
+        elif entry.n_groups is not None and entry.n_groups > 1:  # values of a single group are reported as a scalar by report_value
+            self.variables[entry.name] = TimeseriesBuffer(n_timesteps, (entry.n_groups, ))
+        else:
+            self.variables[entry.name] = TimeseriesBuffer(n_timesteps)
 
     def step(self) -> None:
-        """This method is called every timestep. First appends the current model time to the list of times for the reporter. Then iterates through the data to be reported on and calls the extract_agent_data method for each of them."""
+        """This method is called every timestep. First appends the current model time to the list of times for the reporter and formats the time once for use in export filenames. Then iterates through the compiled report configuration and calls the extract_agent_data method for each of them."""
         self.timesteps.append(self.model.current_time)
-        if self.model.config is not None and 'report' in self.model.config:
-            for name, conf in self.model.config['report'].items():
-                self.extract_agent_data(name, conf)
+        self.timestep_tag = self.model.current_time.isoformat().translate(self.ISO_STRIP)
+        for entry in self.plan:
+            self.extract_agent_data(entry)
+
+    @staticmethod
+    def is_scalar_timeseries(values: Union[list, TimeseriesBuffer]) -> bool:
+        """Checks whether stored values contain a single scalar for each timestep.
+
+        Args:
+            values: The stored values.
+
+        Returns:
+            is_scalar: Whether each timestep holds a scalar.
+        """
+        if isinstance(values, TimeseriesBuffer):
+            return values.shape == ()
+        return not any(isinstance(value, Iterable) for value in values)
 
     def report(self) -> dict:
-        """This method can be called to save the data that is currently saved in memory to disk."""
+        """This method can be called to save the data that is currently saved in memory to disk. Data that is saved in NumPy binary format is written directly, while for the other formats a DataFrame is created first."""
+        self.flush()
         report_dict = {}
         for name, values in self.variables.items():
-            if isinstance(values, dict):
+            IDs = None
+            if isinstance(values, TimeseriesBuffer):
+                values = values.array
+            if 'format' not in self.model.config['report'][name]:
+                raise ValueError(f"Key 'format' not specified in config file for {name}")
+            export_format = self.model.config['report'][name]['format']
+            filepath = os.path.join(self.export_folder, name + '.' + export_format)
+            if isinstance(values, dict) and values and all(self.is_scalar_timeseries(ID_values) for ID_values in values.values()):
+                # stack the values of all IDs into a single array of timesteps x IDs
+                IDs = self.ID_order.get(name)
+                if IDs is None or set(IDs) != set(values.keys()):  # IDs were added or did not report since the reporter was created
+                    IDs = list(values.keys())
+                values = np.column_stack([np.asarray(values[ID]) for ID in IDs])
+                if export_format == 'npy':
+                    np.save(filepath, values)
+                    continue
+            elif export_format == 'npy' and not isinstance(values, dict):
+                # arrays have the same layout as the DataFrames created for the other formats
+                if isinstance(values, np.ndarray):
+                    array = values[:, np.newaxis] if values.ndim == 1 else values.T
+                elif isinstance(values[0], Iterable):
+                    array = np.stack(values, axis=1)
+                else:
+                    array = np.asarray(values)[:, np.newaxis]
+                np.save(filepath, array)
+                continue
+            import pandas as pd  # pandas is only imported when needed, because importing it is slow
+            if IDs is not None:
+                df = pd.DataFrame(values, index=self.timesteps, columns=IDs)
+            elif isinstance(values, dict):
                 df = pd.DataFrame.from_dict(values)
                 df.index = self.timesteps
+            elif isinstance(values, np.ndarray):
+                if values.ndim == 1:
+                    df = pd.DataFrame(values, index=self.timesteps, columns=[name])
+                else:
+                    df = pd.DataFrame(values.T, columns=self.timesteps)
             elif isinstance(values[0], Iterable):
                 df = pd.DataFrame.from_dict(
                     {
@@ -277,10 +600,6 @@ class Reporter:
                 )
             else:
                 df = pd.DataFrame(values, index=self.timesteps, columns=[name])
-            if 'format' not in self.model.config['report'][name]:
-                raise ValueError(f"Key 'format' not specified in config file for {name}")
-            export_format = self.model.config['report'][name]['format']
-            filepath = os.path.join(self.export_folder, name + '.' + export_format)
             if export_format == 'csv':
                 df.to_csv(filepath)
             elif export_format == 'xlsx':
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from honeybees.reporter import Reporter
+
+class People:
+    def __init__(self):
+        self.age = np.array([10., 20., 30., 40.])
+        self.region = np.array([0, 0, 1, 1])
+        self.name = np.array(['a', 'b', 'c', 'd'])
+        self.employed = np.array([True, False, True, True])
+
+class Regions:
+    def __init__(self):
+        self.ids = np.array([0, 1, 2])
+        self.income = [np.array([1., 2., 3.]), np.array([], dtype=np.float64), np.array([4., 6.])]
+
+class Agents:
+    def __init__(self):
+        self.people = People()
+        self.regions = Regions()
+
+class Model:
+    def __init__(self, report_folder, report, n_timesteps=3):
+        self.config = {
+            'general': {'report_folder': str(report_folder)},
+            'report': report,
+        }
+        self.agents = Agents()
+        self.current_time = datetime(2020, 1, 1)
+        self.current_timestep = 0
+        self.timestep_length = timedelta(days=1)
+        self.n_timesteps = n_timesteps
+        self.logger = logging.getLogger('honeybees')
+
+    def step(self):
+        self.reporter.step()
+        self.current_time += self.timestep_length
+        self.current_timestep += 1
+
+def create_model(tmp_path, report, n_timesteps=3):
+    model = Model(tmp_path, report, n_timesteps=n_timesteps)
+    model.reporter = Reporter(model)
+    return model
+
+def test_mean_and_sum_per_ID():
+    values = np.array([1., 2., 3., 4., 5.])
+    group_ids = np.array([0, 0, 2, 2, 2])
+    n_groups = 4
+
+    mean = Reporter.mean_per_ID(values, group_ids, n_groups)
+    np.testing.assert_array_equal(mean, [1.5, np.nan, 4., np.nan])
+
+    total = Reporter.sum_per_ID(values, group_ids, n_groups)
+    np.testing.assert_array_equal(total, [3., 0., 12., 0.])
+    assert total.dtype == np.float64
+
+    rng = np.random.default_rng(0)
+    values = rng.random(1000)
+    group_ids = rng.integers(0, 10, 1000)
+    np.testing.assert_allclose(Reporter.mean_per_ID(values, group_ids, 10), [values[group_ids == i].mean() for i in range(10)])
+    np.testing.assert_allclose(Reporter.sum_per_ID(values, group_ids, 10), [values[group_ids == i].sum() for i in range(10)])
+
+def test_export_csv(tmp_path):
+    report = {
+        'age': {'type': 'people', 'varname': 'age', 'function': None, 'save': 'export', 'format': 'csv'},
+        'region': {'type': 'people', 'varname': 'region', 'function': None, 'save': 'export', 'format': 'csv'},
+        'name': {'type': 'people', 'varname': 'name', 'function': None, 'save': 'export', 'format': 'csv'},
+        'employed': {'type': 'people', 'varname': 'employed', 'function': None, 'save': 'export', 'format': 'csv'},
+        'location': {'type': 'people', 'varname': 'location', 'function': None, 'save': 'export', 'format': 'csv'},
+    }
+    model = Model(tmp_path, report)
+    model.agents.people.age = np.array([0.1, 2., 3.5, 4.])
+    model.agents.people.location = np.array([[1., 2.], [3., 4.]])
+    model.reporter = Reporter(model)
+    fn = model.reporter.timestep_tag + '.csv'
+
+    with open(tmp_path / 'age' / fn, 'rb') as f:
+        assert f.read() == b'0.1\n2.0\n3.5\n4.0'
+    with open(tmp_path / 'region' / fn, 'rb') as f:
+        assert f.read() == b'0\n0\n1\n1'
+    with open(tmp_path / 'name' / fn, 'rb') as f:
+        assert f.read() == b'a\nb\nc\nd\n'
+    with open(tmp_path / 'employed' / fn, 'rb') as f:
+        assert f.read() == b'True\nFalse\nTrue\nTrue'
+    with open(tmp_path / 'location' / fn, 'rb') as f:
+        assert f.read() == b'[1.0, 2.0]\n[3.0, 4.0]'
+
+@pytest.mark.parametrize('n_timesteps', [3, None])
+def test_variables_during_run(tmp_path, n_timesteps):
+    report = {
+        'mean_age': {'type': 'people', 'varname': 'age', 'function': 'mean', 'save': 'save', 'format': 'csv'},
+        'mean_age_per_region': {'type': 'people', 'varname': 'age', 'function': 'mean', 'scale': 'region', 'ids': np.array([0, 1]), 'save': 'save', 'format': 'csv'},
+        'sum_region': {'type': 'people', 'varname': 'region', 'function': 'sum', 'save': 'save', 'format': 'csv'},
+    }
+    model = create_model(tmp_path, report, n_timesteps=n_timesteps)
+    model.step()
+
+    mean_age = model.reporter.variables['mean_age']
+    assert len(mean_age) == len(model.reporter.timesteps) == 2
+    assert mean_age[-1] == 25.
+    assert list(mean_age[0:]) == [25., 25.]
+    json.dumps(list(mean_age[0:]))
+
+    mean_age_per_region = model.reporter.variables['mean_age_per_region']
+    assert list(mean_age_per_region[-1]) == [15., 35.]
+
+    sum_region = model.reporter.variables['sum_region']
+    assert sum_region[-1] == 2
+    assert isinstance(sum_region[-1], int)
+
+    for _ in range(5):  # more steps than preallocated
+        model.step()
+    assert len(mean_age) == 7
+    assert mean_age[-1] == 25.
+
+@pytest.mark.parametrize('n_timesteps', [3, None])
+def test_report_single_group(tmp_path, n_timesteps):
+    report = {
+        'mean_age_per_region': {'type': 'people', 'varname': 'age', 'function': 'mean', 'scale': 'region', 'ids': np.array([0]), 'save': 'save', 'format': 'csv'},
+    }
+    model = Model(tmp_path, report, n_timesteps=n_timesteps)
+    model.agents.people.region = np.zeros(4, dtype=np.int64)
+    model.reporter = Reporter(model)
+    model.agents.people.age = np.array([15., 25., 25., 35.])
+    model.step()
+    model.reporter.report()
+
+    mean_age_per_region = pd.read_csv(tmp_path / 'mean_age_per_region.csv', index_col=0)
+    assert list(mean_age_per_region.columns) == ['mean_age_per_region']
+    assert list(mean_age_per_region['mean_age_per_region']) == [25., 25.]
+
+def test_export_initial_only(tmp_path):
+    report = {
+        'age': {'type': 'people', 'varname': 'age', 'function': None, 'save': 'export', 'format': 'csv', 'initial_only': True},
+    }
+    model = create_model(tmp_path, report)
+    initial_fn = model.reporter.timestep_tag + '.csv'
+    model.step()
+    model.step()
+    assert os.listdir(tmp_path / 'age') == [initial_fn]
+
+def test_split_with_empty_ID(tmp_path):
+    report = {
+        'income_mean': {'type': 'regions', 'varname': 'income', 'function': 'mean', 'split': True, 'save': 'save', 'format': 'csv'},
+        'income_sum': {'type': 'regions', 'varname': 'income', 'function': 'sum', 'split': True, 'save': 'save', 'format': 'csv'},
+        'income': {'type': 'regions', 'varname': 'income', 'function': None, 'split': True, 'save': 'save', 'format': 'csv'},
+    }
+    model = create_model(tmp_path, report)
+    variables = model.reporter.variables
+
+    assert list(variables['income_mean'][0]) == [2.]
+    assert np.isnan(variables['income_mean'][1][-1])
+    assert list(variables['income_mean'][2]) == [5.]
+    assert list(variables['income_sum'][0]) == [6.]
+    assert list(variables['income_sum'][1]) == [0.]
+    assert list(variables['income_sum'][2]) == [10.]
+    np.testing.assert_array_equal(variables['income'][2][0], [4., 6.])
+    assert variables['income'][1][0].size == 0
+
+def test_export_npy(tmp_path):
+    report = {
+        'age': {'type': 'people', 'varname': 'age', 'function': lambda age: age, 'save': 'export', 'format': 'npy'},
+    }
+    model = create_model(tmp_path, report)
+    model.reporter.flush()
+    worker_blocked = threading.Event()
+    model.reporter.io_pool.submit(worker_blocked.wait)  # keep the write queued while the agent data changes
+    model.step()
+    model.agents.people.age[:] = 0
+    worker_blocked.set()
+    model.reporter.flush()
+    np.testing.assert_array_equal(np.load(tmp_path / 'age' / (model.reporter.timestep_tag + '.npy')), [10., 20., 30., 40.])
+
+def test_export_npy_error(tmp_path):
+    report = {
+        'age': {'type': 'people', 'varname': 'age', 'function': None, 'save': 'export', 'format': 'npy'},
+    }
+    model = create_model(tmp_path, report)
+    model.reporter.flush()
+    shutil.rmtree(tmp_path / 'age')
+    model.step()
+    model.reporter.pending_writes[-1].exception()  # wait for the write to fail
+    with pytest.raises(FileNotFoundError):
+        model.step()
+
+@pytest.mark.parametrize('export_format', ['csv', 'npy'])
+def test_report(tmp_path, export_format):
+    report = {
+        'mean_age': {'type': 'people', 'varname': 'age', 'function': 'mean', 'save': 'save', 'format': export_format},
+        'mean_age_per_region': {'type': 'people', 'varname': 'age', 'function': 'mean', 'scale': 'region', 'ids': np.array([0, 1]), 'save': 'save', 'format': export_format},
+        'income_sum': {'type': 'regions', 'varname': 'income', 'function': 'sum', 'split': True, 'save': 'save', 'format': export_format},
+        'income': {'type': 'regions', 'varname': 'income', 'function': None, 'split': True, 'save': 'save', 'format': export_format},
+    }
+    model = create_model(tmp_path, report, n_timesteps=3)
+    model.step()
+    model.reporter.report()
+
+    if export_format == 'npy':
+        mean_age = np.load(tmp_path / 'mean_age.npy')
+        np.testing.assert_array_equal(mean_age, [[25.], [25.]])
+        mean_age_per_region = np.load(tmp_path / 'mean_age_per_region.npy')
+        np.testing.assert_array_equal(mean_age_per_region, [[15., 15.], [35., 35.]])
+        income_sum = np.load(tmp_path / 'income_sum.npy')
+        np.testing.assert_array_equal(income_sum, [[6., 0., 10.], [6., 0., 10.]])
+        income = np.load(tmp_path / 'income.npy', allow_pickle=True)
+        assert income.shape == (2, 3)
+        np.testing.assert_array_equal(income[1, 2], [4., 6.])
+    else:
+        mean_age = pd.read_csv(tmp_path / 'mean_age.csv', index_col=0)
+        assert list(mean_age['mean_age']) == [25., 25.]
+        mean_age_per_region = pd.read_csv(tmp_path / 'mean_age_per_region.csv', index_col=0)
+        assert mean_age_per_region.shape == (2, 2)
+        assert list(mean_age_per_region.iloc[:, 0]) == [15., 35.]
+        income_sum = pd.read_csv(tmp_path / 'income_sum.csv', index_col=0)
+        assert list(income_sum.columns) == ['0', '1', '2']
+        assert list(income_sum.iloc[0]) == [6., 0., 10.]
+        income = pd.read_csv(tmp_path / 'income.csv', index_col=0)
+        assert income.shape == (2, 3)
+
+def test_report_changed_IDs(tmp_path):
+    report = {
+        'income_sum': {'type': 'regions', 'varname': 'income', 'function': 'sum', 'split': True, 'save': 'save', 'format': 'csv'},
+    }
+    model = create_model(tmp_path, report)
+    model.reporter.ID_order['income_sum'] = [0, 1, 5]  # order no longer matches the IDs that reported
+    model.step()
+    model.reporter.report()
+    income_sum = pd.read_csv(tmp_path / 'income_sum.csv', index_col=0)
+    assert list(income_sum.columns) == ['0', '1', '2']
+    assert list(income_sum.iloc[1]) == [6., 0., 10.]
+
+def test_write_npy(tmp_path):
+    large = np.arange(Reporter.MEMMAP_THRESHOLD // 8 + 1, dtype=np.float64).reshape(-1, 1)
+    assert large.nbytes >= Reporter.MEMMAP_THRESHOLD
+    Reporter.write_npy(str(tmp_path / 'large.npy'), large)
+    np.testing.assert_array_equal(np.load(tmp_path / 'large.npy'), large)
+    np.testing.assert_array_equal(np.load(tmp_path / 'large.npy', mmap_mode='r'), large)
+
+    small = np.array([1, 2, 3])
+    Reporter.write_npy(str(tmp_path / 'small.npy'), small)
+    np.testing.assert_array_equal(np.load(tmp_path / 'small.npy'), small)